@@ -6,9 +6,11 @@ import cv2
 import shutil
 import logging
 import threading
+import multiprocessing
 import customtkinter as ctk
+from dataclasses import dataclass, field
 from tkinter import filedialog, messagebox
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 
 from text_removal.config import (
     DEFAULT_PHRASES,
@@ -19,9 +21,14 @@ from text_removal.config import (
     DEFAULT_DILATE,
     DEFAULT_KERNEL_SIZE
 )
-from text_removal.remove import remove_phrases, logger as remove_logger
+from text_removal.remove import remove_phrases_from_bytes, logger as remove_logger
 from text_removal.tesseract_utils import configure_tesseract
 
+try:
+    from yaml import CSafeLoader as _YamlLoader, CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader, SafeDumper as _YamlDumper
+
 """
 A CustomTkinter GUI for text removal. Features:
 - Single 'Run/Cancel' button that toggles between run state and cancel state.
@@ -34,23 +41,35 @@ No inline comments, only docstrings.
 
 DEFAULT_INPAINT_METHOD = cv2.INPAINT_TELEA
 DEFAULT_INPAINT_RADIUS = 3
-executor = None
-canceled = False
-is_running = False
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".bmp", ".tiff", ".webp")
+IMAGE_EXTS_ALL = IMAGE_EXTS + tuple(ext.upper() for ext in IMAGE_EXTS)
+
+@dataclass
+class RunState:
+    """
+    Mutable state for one processing run, shared between the GUI thread
+    and the background aggregator thread. cancel_event starts as a plain
+    threading.Event and is swapped for a Manager-backed event once the
+    worker pool exists, so cancellation reaches worker processes too.
+    """
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+    running: bool = False
+
+current_run = None
 
 def load_yaml_config(file_path):
     """
     Loads YAML data from file_path and returns it as a dict.
     """
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
+    with open(file_path, 'rb') as f:
+        return yaml.load(f, Loader=_YamlLoader)
 
 def save_yaml_config(config_data, file_path):
     """
     Saves config_data to a YAML file at file_path.
     """
-    with open(file_path, 'w', encoding='utf-8') as f:
-        yaml.safe_dump(config_data, f)
+    with open(file_path, 'wb') as f:
+        yaml.dump(config_data, f, Dumper=_YamlDumper, encoding='utf-8')
 
 def validate_tesseract_path(tesseract_cmd):
     """
@@ -80,7 +99,7 @@ def merge_defaults():
         "output_format": "original",
         "input_dir": "input",
         "output_dir": "output",
-        "inpaint_method": "TELEA",
+        "inpaint_method": "AUTO",
         "inpaint_radius": str(DEFAULT_INPAINT_RADIUS),
         "config_file": ""
     }
@@ -102,8 +121,8 @@ def merge_config_into_gui(config_dict, gui_settings):
     gui_settings["output_format"] = config_dict.get("output_format", "original") or "original"
     gui_settings["input_dir"] = config_dict.get("input_dir", "input")
     gui_settings["output_dir"] = config_dict.get("output_dir", "output")
-    im = config_dict.get("inpaint_method", "TELEA")
-    gui_settings["inpaint_method"] = "NS" if im == "NS" else "TELEA"
+    im = config_dict.get("inpaint_method", "AUTO")
+    gui_settings["inpaint_method"] = im if im in ("AUTO", "TELEA", "NS") else "AUTO"
     gui_settings["inpaint_radius"] = str(config_dict.get("inpaint_radius", DEFAULT_INPAINT_RADIUS))
 
 def build_config_from_gui(gui_settings):
@@ -115,8 +134,8 @@ def build_config_from_gui(gui_settings):
     if fmt_choice == "original":
         fmt_choice = None
     method_str = gui_settings["inpaint_method"]
-    if method_str not in ("TELEA", "NS"):
-        method_str = "TELEA"
+    if method_str not in ("AUTO", "TELEA", "NS"):
+        method_str = "AUTO"
     return {
         "phrases": gui_settings["phrases"],
         "tesseract_cmd": gui_settings["tesseract_cmd"] or None,
@@ -137,125 +156,249 @@ def build_config_from_gui(gui_settings):
 
 def inpaint_method_to_cv2(method_str):
     """
-    Converts a string (TELEA/NS) to cv2.INPAINT_TELEA or cv2.INPAINT_NS.
+    Converts a string (AUTO/TELEA/NS) to the inpaint_method value the
+    removal functions expect: cv2.INPAINT_TELEA, cv2.INPAINT_NS, or None
+    for the per-region automatic choice.
     """
     if method_str == "NS":
         return cv2.INPAINT_NS
-    return cv2.INPAINT_TELEA
+    if method_str == "TELEA":
+        return cv2.INPAINT_TELEA
+    return None
+
+def _read_file_bytes(path):
+    """
+    Reads a file's raw bytes. Runs on the prefetch pool so workers get
+    already-read data instead of blocking on disk.
+    """
+    with open(path, 'rb') as f:
+        return f.read()
+
+def _worker_init(tesseract_cmd):
+    """
+    Configures Tesseract once per worker process, instead of per image.
+    """
+    configure_tesseract(tesseract_cmd)
+
+def _encode_and_write(out_path, img):
+    """
+    Encodes an image for out_path's extension and writes the buffer in a
+    single low-level write. Runs on a write pool so the aggregator loop
+    is not blocked by encoding or a slow output volume.
+    """
+    ext = os.path.splitext(out_path)[1] or ".png"
+    ok, buf = cv2.imencode(ext, img)
+    if not ok:
+        remove_logger.error("Could not encode image: %s", out_path)
+        return
+    fd = os.open(out_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, buf)
+    finally:
+        os.close(fd)
 
-def cancel_processing(status_label, run_cancel_button):
+def cancel_processing(state, status_label, run_cancel_button):
     """
-    Sets a global canceled flag and updates the UI state to canceled.
+    Signals the active run's cancel event and updates the UI state.
     """
-    global canceled
-    canceled = True
+    state.cancel_event.set()
     status_label.configure(text="Canceling...")
     run_cancel_button.configure(text="Run")
 
-def run_removal_in_thread(config_data, progress_bar, progress_label, status_label, run_cancel_button):
+def run_removal_in_thread(config_data, state, pending_update, run_cancel_button):
     """
-    Runs text removal in a background thread, with progress tracking. 
-    Cancels if user requests. Toggles 'Run/Cancel' button text appropriately.
+    Runs text removal in a background thread, with progress tracking.
+    Progress is posted into pending_update, a shared dict drained on the
+    GUI thread, so worker threads never touch Tk widgets directly.
+    Cancels if state's cancel event is set. Toggles 'Run/Cancel' button
+    text appropriately.
     """
-    global executor
-    global canceled
-    global is_running
-
     try:
         logging.getLogger().setLevel(logging.DEBUG if config_data["debug"] else logging.INFO)
         validate_tesseract_path(config_data["tesseract_cmd"])
         configure_tesseract(config_data["tesseract_cmd"])
         input_dir = config_data["input_dir"]
         output_dir = config_data["output_dir"]
-        exts = (".png", ".jpg", ".jpeg", ".bmp", ".tiff", ".webp")
-        files = [f for f in os.listdir(input_dir) if f.lower().endswith(exts)]
+        with os.scandir(input_dir) as it:
+            entries = [(e.name, e.stat().st_size) for e in it
+                       if e.is_file() and e.name.endswith(IMAGE_EXTS_ALL)]
+        entries.sort(key=lambda entry: entry[1], reverse=True)
+        files = [name for name, _ in entries]
         if not files:
             messagebox.showwarning("No Files", f"No images found in '{input_dir}'.")
             run_cancel_button.configure(text="Run")
-            is_running = False
+            state.running = False
             return
         os.makedirs(output_dir, exist_ok=True)
         debug_dir = None
         if config_data["debug"]:
             debug_dir = os.path.join(output_dir, "debug")
             os.makedirs(debug_dir, exist_ok=True)
+        output_dir_s = output_dir.rstrip(os.sep) + os.sep
+        debug_dir_s = debug_dir.rstrip(os.sep) + os.sep if debug_dir else None
 
         total_files = len(files)
-        progress_bar.set(0.0)
-        progress_label.configure(text="0%")
+        pending_update["fraction"] = 0.0
         completed = 0
-        start_time = time.time()
-        executor = ThreadPoolExecutor(max_workers=config_data["max_workers"])
-        futures = {}
-
-        for f in files:
-            path_in = os.path.join(input_dir, f)
+        last_remain_int = -1
+        last_status_ts = 0.0
+        start_time = time.monotonic()
+        executor = ProcessPoolExecutor(
+            max_workers=config_data["max_workers"],
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_worker_init,
+            initargs=(config_data["tesseract_cmd"],)
+        )
+        manager = multiprocessing.Manager()
+        cancel_event = manager.Event()
+        if state.cancel_event.is_set():
+            cancel_event.set()
+        state.cancel_event = cancel_event
+        io_pool = ThreadPoolExecutor(max_workers=2)
+        write_pool = ThreadPoolExecutor(max_workers=2)
+        write_futures = set()
+        read_inflight = {}
+        proc_inflight = {}
+        pending_files = iter(files)
+        max_inflight = config_data["max_workers"] + 2
+
+        phrases = config_data["phrases"]
+        tesseract_cmd = config_data["tesseract_cmd"]
+        debug_mode = config_data["debug"]
+        pad_width = config_data["pad_width"]
+        pad_height = config_data["pad_height"]
+        inpaint_radius = config_data["inpaint_radius"]
+        inpaint_method = inpaint_method_to_cv2(config_data["inpaint_method"])
+        do_dilate = config_data["dilate"]
+        kernel_size = config_data["kernel_size"]
+        combine_threshold = config_data["combine_threshold"]
+        output_format = config_data["output_format"]
+
+        def submit_read():
+            """
+            Starts prefetching the next pending file, if any remain.
+            Returns True if a read was submitted.
+            """
+            f = next(pending_files, None)
+            if f is None:
+                return False
+            raw_fut = io_pool.submit(_read_file_bytes, os.path.join(input_dir, f))
+            read_inflight[raw_fut] = f
+            return True
+
+        def submit_process(fname, raw_bytes):
+            """
+            Hands prefetched file bytes to a worker process for removal.
+            """
             fut = executor.submit(
-                remove_phrases,
-                image_path=path_in,
-                phrases=config_data["phrases"],
-                tesseract_cmd=config_data["tesseract_cmd"],
-                debug=config_data["debug"],
-                pad_width=config_data["pad_width"],
-                pad_height=config_data["pad_height"],
-                inpaint_radius=config_data["inpaint_radius"],
-                inpaint_method=inpaint_method_to_cv2(config_data["inpaint_method"]),
-                do_dilate=config_data["dilate"],
-                dilate_kernel_size=config_data["kernel_size"],
-                combine_threshold=config_data["combine_threshold"]
+                remove_phrases_from_bytes,
+                raw_bytes,
+                phrases,
+                tesseract_cmd=tesseract_cmd,
+                debug=debug_mode,
+                pad_width=pad_width,
+                pad_height=pad_height,
+                inpaint_radius=inpaint_radius,
+                inpaint_method=inpaint_method,
+                do_dilate=do_dilate,
+                dilate_kernel_size=kernel_size,
+                combine_threshold=combine_threshold,
+                cancel_event=cancel_event,
+                source=fname
             )
-            futures[fut] = f
-
-        for fut in as_completed(futures):
-            if canceled:
-                break
+            proc_inflight[fut] = fname
+
+        def note_completed():
+            """
+            Records one finished file and posts progress/ETA updates.
+            The ETA is withheld for the first couple of files, where the
+            estimate is dominated by startup cost, and refreshed at most
+            twice a second after that.
+            """
+            nonlocal completed, last_remain_int, last_status_ts
             completed += 1
-            fraction = completed / total_files
-            progress_bar.set(fraction)
-            progress_label.configure(text=f"{int(fraction*100)}%")
-            elapsed = time.time() - start_time
-            avg_per_file = elapsed / completed if completed else 0
-            remain = (total_files - completed) * avg_per_file
-            remain_str = time.strftime("%M:%S", time.gmtime(remain))
-            status_label.configure(text=f"Processed {completed}/{total_files} | ~{remain_str} left")
-
-            try:
-                result = fut.result()
-            except Exception as e:
-                remove_logger.error("Error processing '%s': %s", futures[fut], e)
-                continue
-
-            if result is None:
-                remove_logger.error("Could not process '%s'.", futures[fut])
-            else:
-                basename, orig_ext = os.path.splitext(futures[fut])
-                if config_data["debug"] and isinstance(result, tuple):
-                    final_img, dbg_img = result
-                else:
-                    final_img, dbg_img = result, None
-                chosen_fmt = config_data["output_format"]
-                if chosen_fmt is None:
-                    out_ext = orig_ext
+            pending_update["fraction"] = completed / total_files
+            if completed < 3:
+                return
+            now = time.monotonic()
+            if now - last_status_ts < 0.5:
+                return
+            avg_per_file = (now - start_time) / completed
+            remain_int = int((total_files - completed) * avg_per_file)
+            if remain_int != last_remain_int:
+                last_remain_int = remain_int
+                last_status_ts = now
+                remain_str = f"{remain_int//60:02d}:{remain_int%60:02d}"
+                pending_update["status"] = f"Processed {completed}/{total_files} | ~{remain_str} left"
+
+        for _ in range(max_inflight):
+            if not submit_read():
+                break
+
+        while (read_inflight or proc_inflight) and not cancel_event.is_set():
+            done, _ = wait(
+                set(read_inflight) | set(proc_inflight),
+                timeout=0.2,
+                return_when=FIRST_COMPLETED
+            )
+            for fut in done:
+                if cancel_event.is_set():
+                    break
+                if fut in read_inflight:
+                    fname = read_inflight.pop(fut)
+                    try:
+                        raw_bytes = fut.result()
+                    except Exception as e:
+                        remove_logger.error("Error reading '%s': %s", fname, e)
+                        note_completed()
+                        submit_read()
+                    else:
+                        submit_process(fname, raw_bytes)
+                    continue
+
+                fname = proc_inflight.pop(fut)
+                note_completed()
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    remove_logger.error("Error processing '%s': %s", fname, e)
                 else:
-                    out_ext = f".{chosen_fmt.lower()}"
-                out_name = basename + out_ext
-                out_path = os.path.join(output_dir, out_name)
-                cv2.imwrite(out_path, final_img)
-                if dbg_img is not None and debug_dir:
-                    dbg_path = os.path.join(debug_dir, "debug_" + out_name)
-                    cv2.imwrite(dbg_path, dbg_img)
+                    if result is None:
+                        remove_logger.error("Could not process '%s'.", fname)
+                    else:
+                        basename, orig_ext = os.path.splitext(fname)
+                        if debug_mode and isinstance(result, tuple):
+                            final_img, dbg_img = result
+                        else:
+                            final_img, dbg_img = result, None
+                        if output_format is None:
+                            out_ext = orig_ext
+                        else:
+                            out_ext = f".{output_format.lower()}"
+                        out_name = basename + out_ext
+                        out_path = output_dir_s + out_name
+                        write_futures.add(write_pool.submit(_encode_and_write, out_path, final_img))
+                        if dbg_img is not None and debug_dir_s:
+                            dbg_path = debug_dir_s + "debug_" + out_name
+                            write_futures.add(write_pool.submit(_encode_and_write, dbg_path, dbg_img))
+                submit_read()
 
         executor.shutdown(wait=False, cancel_futures=True)
-        if canceled:
-            status_label.configure(text="Canceled.")
+        io_pool.shutdown(wait=False, cancel_futures=True)
+        if write_futures:
+            wait(write_futures)
+        write_pool.shutdown(wait=True)
+        was_canceled = cancel_event.is_set()
+        manager.shutdown()
+        if was_canceled:
+            pending_update["status"] = "Canceled."
             messagebox.showinfo("Canceled", "Processing was canceled.")
         else:
             messagebox.showinfo("Done", "Processing Complete!")
     except Exception as e:
         messagebox.showerror("Error", str(e))
 
-    is_running = False
-    canceled = False
+    state.running = False
     run_cancel_button.configure(text="Run")
 
 def start_removal(gui_settings, progress_bar, progress_label, status_label, run_cancel_button):
@@ -263,21 +406,39 @@ def start_removal(gui_settings, progress_bar, progress_label, status_label, run_
     Builds final config from gui_settings and launches run_removal_in_thread 
     in a separate thread if not already running. If running, triggers cancel.
     """
-    global is_running
-    global canceled
-    if not is_running:
-        is_running = True
-        canceled = False
+    global current_run
+    if current_run is None or not current_run.running:
+        state = RunState(running=True)
+        current_run = state
         run_cancel_button.configure(text="Cancel")
         config_data = build_config_from_gui(gui_settings)
+        pending_update = {}
+
+        def _flush_updates():
+            """
+            Applies any pending progress values to the widgets, then
+            re-schedules itself while a run is active. Runs on the GUI
+            thread, coalescing bursts of completions into one redraw.
+            """
+            fraction = pending_update.pop("fraction", None)
+            if fraction is not None:
+                progress_bar.set(fraction)
+                progress_label.configure(text=f"{int(fraction*100)}%")
+            status = pending_update.pop("status", None)
+            if status is not None:
+                status_label.configure(text=status)
+            if state.running or pending_update:
+                progress_bar.after(33, _flush_updates)
+
         t = threading.Thread(
             target=run_removal_in_thread,
-            args=(config_data, progress_bar, progress_label, status_label, run_cancel_button),
+            args=(config_data, state, pending_update, run_cancel_button),
             daemon=True
         )
         t.start()
+        progress_bar.after(33, _flush_updates)
     else:
-        cancel_processing(status_label, run_cancel_button)
+        cancel_processing(current_run, status_label, run_cancel_button)
 
 def refresh_gui_from_settings(gui_settings, basic_tab, adv_tab, phrases_widget):
     """
@@ -295,7 +456,8 @@ def refresh_gui_from_settings(gui_settings, basic_tab, adv_tab, phrases_widget):
     adv_tab["dilate_var"].set(gui_settings.get("dilate", False))
     adv_tab["k_size_var"].set(gui_settings.get("kernel_size", ""))
     adv_tab["format_var"].set(gui_settings.get("output_format", "original"))
-    adv_tab["method_var"].set("NS" if gui_settings.get("inpaint_method") == "NS" else "TELEA")
+    method_str = gui_settings.get("inpaint_method")
+    adv_tab["method_var"].set(method_str if method_str in ("AUTO", "TELEA", "NS") else "AUTO")
     adv_tab["radius_var"].set(gui_settings.get("inpaint_radius", str(DEFAULT_INPAINT_RADIUS)))
     phrases_widget.delete("0.0", "end")
     for phrase in gui_settings.get("phrases", []):
@@ -317,7 +479,7 @@ def update_settings_from_gui(gui_settings, basic_tab, adv_tab, phrases_widget):
     gui_settings["dilate"] = bool(adv_tab["dilate_var"].get())
     gui_settings["kernel_size"] = adv_tab["k_size_var"].get()
     gui_settings["output_format"] = adv_tab["format_var"].get() or "original"
-    gui_settings["inpaint_method"] = adv_tab["method_var"].get() or "TELEA"
+    gui_settings["inpaint_method"] = adv_tab["method_var"].get() or "AUTO"
     gui_settings["inpaint_radius"] = adv_tab["radius_var"].get()
     all_text = phrases_widget.get("0.0", "end").strip()
     lines = [line for line in all_text.split("\n") if line.strip()]
@@ -460,7 +622,7 @@ def build_gui():
     adv_tab["dilate_var"] = ctk.BooleanVar()
     adv_tab["k_size_var"] = ctk.StringVar()
     adv_tab["format_var"] = ctk.StringVar()
-    adv_tab["method_var"] = ctk.StringVar(value="TELEA")
+    adv_tab["method_var"] = ctk.StringVar(value="AUTO")
     adv_tab["radius_var"] = ctk.StringVar()
 
     ctk.CTkLabel(adv_frame, text="Tesseract Cmd:").grid(row=0, column=0, sticky="e", padx=5, pady=5)
@@ -488,7 +650,7 @@ def build_gui():
     ctk.CTkOptionMenu(adv_frame, values=fmt_values, variable=adv_tab["format_var"], width=100).grid(row=7, column=1, padx=5, pady=5)
 
     ctk.CTkLabel(adv_frame, text="Inpaint Method:").grid(row=8, column=0, sticky="e", padx=5, pady=5)
-    method_values = ["TELEA", "NS"]
+    method_values = ["AUTO", "TELEA", "NS"]
     ctk.CTkOptionMenu(adv_frame, values=method_values, variable=adv_tab["method_var"], width=80).grid(row=8, column=1, padx=5, pady=5)
 
     ctk.CTkLabel(adv_frame, text="Inpaint Radius:").grid(row=9, column=0, sticky="e", padx=5, pady=5)
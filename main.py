@@ -3,7 +3,8 @@ import sys
 import argparse
 import logging
 import cv2
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 import yaml
 
 from text_removal.config import (
@@ -17,25 +18,68 @@ from text_removal.config import (
     DEFAULT_KERNEL_SIZE,
     DEFAULT_COMBINE_THRESHOLD
 )
-from text_removal.remove import remove_phrases
+from text_removal.remove import remove_phrases_from_bytes
 from text_removal.tesseract_utils import configure_tesseract
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 """
 Command-line interface to remove specified text from images using Tesseract OCR.
 Allows configuration via a YAML file or CLI arguments.
 """
 
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".bmp", ".tiff", ".webp")
+IMAGE_EXTS_ALL = IMAGE_EXTS + tuple(ext.upper() for ext in IMAGE_EXTS)
+
+def _read_file_bytes(path):
+    """
+    Reads a file's raw bytes. Runs on the prefetch pool so worker
+    processes receive already-read data instead of blocking on disk.
+    """
+    with open(path, 'rb') as f:
+        return f.read()
+
+def _worker_init(tesseract_cmd):
+    """
+    Configures Tesseract once per worker process and disables OpenCV's
+    internal threading, which would oversubscribe the cores the pool
+    already occupies.
+    """
+    configure_tesseract(tesseract_cmd)
+    cv2.setNumThreads(0)
+
 def load_config_from_yaml(file_path):
     """
     Loads a YAML file and returns its contents as a dictionary.
     """
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
+    with open(file_path, 'rb') as f:
+        return yaml.load(f, Loader=_YamlLoader)
+
+_CLI_KEYS = (
+    "texts",
+    "tesseract_cmd",
+    "debug",
+    "max_workers",
+    "pad_width",
+    "pad_height",
+    "combine_threshold",
+    "dilate",
+    "kernel_size",
+    "output_format",
+    "input_dir",
+    "output_dir"
+)
 
 def merge_config(cli_args, yaml_config):
     """
     Merges defaults, YAML config, and CLI args into a single dictionary.
-    Priority: CLI > YAML > defaults.
+    Priority: CLI > YAML > defaults. The CLI options are parsed with
+    argparse.SUPPRESS defaults, so an attribute exists on cli_args only
+    when the flag was actually passed and then overrides the YAML value,
+    even when it happens to equal the default.
     """
     final_config = {
         "texts": DEFAULT_PHRASES,
@@ -56,30 +100,9 @@ def merge_config(cli_args, yaml_config):
             final_config[key] = yaml_config[key]
     if "phrases" in yaml_config:
         final_config["texts"] = yaml_config["phrases"]
-    if cli_args.texts != DEFAULT_PHRASES:
-        final_config["texts"] = cli_args.texts
-    if cli_args.tesseract_cmd is not None:
-        final_config["tesseract_cmd"] = cli_args.tesseract_cmd
-    if cli_args.debug:
-        final_config["debug"] = True
-    if cli_args.max_workers != DEFAULT_MAX_WORKERS:
-        final_config["max_workers"] = cli_args.max_workers
-    if cli_args.pad_width != DEFAULT_PAD_WIDTH:
-        final_config["pad_width"] = cli_args.pad_width
-    if cli_args.pad_height != DEFAULT_PAD_HEIGHT:
-        final_config["pad_height"] = cli_args.pad_height
-    if cli_args.combine_threshold != DEFAULT_COMBINE_THRESHOLD:
-        final_config["combine_threshold"] = cli_args.combine_threshold
-    if cli_args.dilate != DEFAULT_DILATE:
-        final_config["dilate"] = cli_args.dilate
-    if cli_args.kernel_size != DEFAULT_KERNEL_SIZE:
-        final_config["kernel_size"] = cli_args.kernel_size
-    if cli_args.output_format is not None:
-        final_config["output_format"] = cli_args.output_format
-    if cli_args.input_dir != "input":
-        final_config["input_dir"] = cli_args.input_dir
-    if cli_args.output_dir != "output":
-        final_config["output_dir"] = cli_args.output_dir
+    for key in _CLI_KEYS:
+        if hasattr(cli_args, key):
+            final_config[key] = getattr(cli_args, key)
     return final_config
 
 def main():
@@ -89,21 +112,21 @@ def main():
     """
     parser = argparse.ArgumentParser(description="Remove specified text from images using Tesseract OCR.")
     parser.add_argument("--config-file", type=str, help="Path to a YAML config file.")
-    parser.add_argument("--texts", nargs="+", default=DEFAULT_PHRASES)
-    parser.add_argument("--tesseract-cmd", default=None)
-    parser.add_argument("--debug", action="store_true")
-    parser.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS)
-    parser.add_argument("--pad-width", type=int, default=DEFAULT_PAD_WIDTH)
-    parser.add_argument("--pad-height", type=int, default=DEFAULT_PAD_HEIGHT)
-    parser.add_argument("--combine-threshold", type=int, default=DEFAULT_COMBINE_THRESHOLD)
-    parser.add_argument("--dilate", action="store_true", default=DEFAULT_DILATE)
-    parser.add_argument("--kernel-size", type=int, default=DEFAULT_KERNEL_SIZE)
-    parser.add_argument("--output-format", default=None)
-    parser.add_argument("--input-dir", default="input")
-    parser.add_argument("--output-dir", default="output")
+    parser.add_argument("--texts", nargs="+", default=argparse.SUPPRESS)
+    parser.add_argument("--tesseract-cmd", default=argparse.SUPPRESS)
+    parser.add_argument("--debug", action="store_true", default=argparse.SUPPRESS)
+    parser.add_argument("--max-workers", type=int, default=argparse.SUPPRESS)
+    parser.add_argument("--pad-width", type=int, default=argparse.SUPPRESS)
+    parser.add_argument("--pad-height", type=int, default=argparse.SUPPRESS)
+    parser.add_argument("--combine-threshold", type=int, default=argparse.SUPPRESS)
+    parser.add_argument("--dilate", action="store_true", default=argparse.SUPPRESS)
+    parser.add_argument("--kernel-size", type=int, default=argparse.SUPPRESS)
+    parser.add_argument("--output-format", default=argparse.SUPPRESS)
+    parser.add_argument("--input-dir", default=argparse.SUPPRESS)
+    parser.add_argument("--output-dir", default=argparse.SUPPRESS)
     args = parser.parse_args()
     logging.basicConfig(
-        level=logging.DEBUG if args.debug else logging.INFO,
+        level=logging.DEBUG if getattr(args, "debug", False) else logging.INFO,
         format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
     )
     yaml_config = {}
@@ -119,9 +142,8 @@ def main():
     input_dir = final_config["input_dir"]
     output_dir = final_config["output_dir"]
     os.makedirs(output_dir, exist_ok=True)
-    exts = (".png", ".jpg", ".jpeg", ".bmp", ".tiff", ".webp")
-    all_files = os.listdir(input_dir)
-    files = [f for f in all_files if f.lower().endswith(exts)]
+    with os.scandir(input_dir) as it:
+        files = [e.name for e in it if e.is_file() and e.name.endswith(IMAGE_EXTS_ALL)]
     if not files:
         logging.warning("No images found in '%s'.", input_dir)
         return
@@ -132,14 +154,39 @@ def main():
         debug_dir = os.path.join(output_dir, "debug")
         os.makedirs(debug_dir, exist_ok=True)
     try:
-        with ThreadPoolExecutor(max_workers=final_config["max_workers"]) as executor:
-            future_to_file = {}
-            for f in files:
-                input_path = os.path.join(input_dir, f)
+        with ProcessPoolExecutor(
+            max_workers=final_config["max_workers"],
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_worker_init,
+            initargs=(final_config["tesseract_cmd"],)
+        ) as executor, \
+                ThreadPoolExecutor(max_workers=4) as io_pool, \
+                ThreadPoolExecutor(max_workers=4) as write_pool:
+            read_inflight = {}
+            proc_inflight = {}
+            write_futures = set()
+            pending_files = iter(files)
+            max_inflight = 2 * final_config["max_workers"]
+
+            def submit_read():
+                """
+                Starts prefetching the next pending file, if any remain.
+                """
+                f = next(pending_files, None)
+                if f is None:
+                    return False
+                raw_future = io_pool.submit(_read_file_bytes, os.path.join(input_dir, f))
+                read_inflight[raw_future] = f
+                return True
+
+            def submit_process(f, raw_bytes):
+                """
+                Hands prefetched file bytes to a worker process.
+                """
                 future = executor.submit(
-                    remove_phrases,
-                    image_path=input_path,
-                    phrases=final_config["texts"],
+                    remove_phrases_from_bytes,
+                    raw_bytes,
+                    final_config["texts"],
                     tesseract_cmd=final_config["tesseract_cmd"],
                     debug=final_config["debug"],
                     pad_width=final_config["pad_width"],
@@ -148,38 +195,63 @@ def main():
                     inpaint_method=DEFAULT_INPAINT_METHOD,
                     do_dilate=final_config["dilate"],
                     dilate_kernel_size=final_config["kernel_size"],
-                    combine_threshold=final_config["combine_threshold"]
+                    combine_threshold=final_config["combine_threshold"],
+                    source=f
                 )
-                future_to_file[future] = f
-            for future in as_completed(future_to_file):
-                f = future_to_file[future]
-                completed += 1
-                try:
-                    result = future.result()
-                except Exception as e:
-                    logging.error("Error processing '%s': %s", f, e)
-                    continue
-                if result is None:
-                    logging.error("Could not process '%s'.", f)
-                else:
-                    if final_config["debug"] and isinstance(result, tuple):
-                        final_img, dbg_img = result
-                    else:
-                        final_img, dbg_img = result, None
-                    basename, orig_ext = os.path.splitext(f)
-                    if final_config["output_format"] is None:
-                        out_ext = orig_ext
+                proc_inflight[future] = f
+
+            for _ in range(max_inflight):
+                if not submit_read():
+                    break
+
+            while read_inflight or proc_inflight:
+                done, _ = wait(
+                    set(read_inflight) | set(proc_inflight),
+                    return_when=FIRST_COMPLETED
+                )
+                for future in done:
+                    if future in read_inflight:
+                        f = read_inflight.pop(future)
+                        try:
+                            raw_bytes = future.result()
+                        except Exception as e:
+                            logging.error("Error reading '%s': %s", f, e)
+                            completed += 1
+                            submit_read()
+                        else:
+                            submit_process(f, raw_bytes)
+                        continue
+                    f = proc_inflight.pop(future)
+                    completed += 1
+                    submit_read()
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logging.error("Error processing '%s': %s", f, e)
+                        continue
+                    if result is None:
+                        logging.error("Could not process '%s'.", f)
                     else:
-                        out_ext = f".{final_config['output_format'].lower()}"
-                    out_fname = basename + out_ext
-                    out_path = os.path.join(output_dir, out_fname)
-                    cv2.imwrite(out_path, final_img)
-                    if dbg_img is not None and debug_dir:
-                        debug_fname = f"debug_{basename}{out_ext}"
-                        debug_path = os.path.join(debug_dir, debug_fname)
-                        cv2.imwrite(debug_path, dbg_img)
-                progress_msg = f"Progress: {completed}/{total_files} ({(completed/total_files)*100:.1f}%)"
-                print(progress_msg, end='\r')
+                        if final_config["debug"] and isinstance(result, tuple):
+                            final_img, dbg_img = result
+                        else:
+                            final_img, dbg_img = result, None
+                        basename, orig_ext = os.path.splitext(f)
+                        if final_config["output_format"] is None:
+                            out_ext = orig_ext
+                        else:
+                            out_ext = f".{final_config['output_format'].lower()}"
+                        out_fname = basename + out_ext
+                        out_path = os.path.join(output_dir, out_fname)
+                        write_futures.add(write_pool.submit(cv2.imwrite, out_path, final_img))
+                        if dbg_img is not None and debug_dir:
+                            debug_fname = f"debug_{basename}{out_ext}"
+                            debug_path = os.path.join(debug_dir, debug_fname)
+                            write_futures.add(write_pool.submit(cv2.imwrite, debug_path, dbg_img))
+                    progress_msg = f"Progress: {completed}/{total_files} ({(completed/total_files)*100:.1f}%)"
+                    print(progress_msg, end='\r')
+            if write_futures:
+                wait(write_futures)
         print()
         logging.info("Processing complete!")
     except KeyboardInterrupt:
@@ -34,29 +34,50 @@ def combine_boxes_close(boxes, threshold, debug=False):
     """
     Merges bounding boxes in a list if they overlap or are within
     the specified threshold distance. Returns a new list of merged boxes.
+    Closeness for all pairs is computed in one NumPy broadcast and the
+    resulting adjacency is merged via connected components, repeating
+    until merged boxes stop bridging new neighbors.
     """
-    merged = True
-    while merged:
-        merged = False
-        new_boxes = []
-        used = [False] * len(boxes)
-        for i in range(len(boxes)):
-            if used[i]:
-                continue
-            x1a, y1a, x2a, y2a = boxes[i]
-            for j in range(i + 1, len(boxes)):
-                if used[j]:
-                    continue
-                x1b, y1b, x2b, y2b = boxes[j]
-                if boxes_are_close((x1a, y1a, x2a, y2a), (x1b, y1b, x2b, y2b), threshold):
-                    nx1 = min(x1a, x1b)
-                    ny1 = min(y1a, y1b)
-                    nx2 = max(x2a, x2b)
-                    ny2 = max(y2a, y2b)
-                    used[j] = True
-                    x1a, y1a, x2a, y2a = nx1, ny1, nx2, ny2
-                    merged = True
-            used[i] = True
-            new_boxes.append((x1a, y1a, x2a, y2a))
-        boxes = new_boxes
+    boxes = list(boxes)
+    while len(boxes) > 1:
+        arr = np.asarray(boxes, dtype=np.int64)
+        x1 = arr[:, 0:1]
+        y1 = arr[:, 1:2]
+        x2 = arr[:, 2:3]
+        y2 = arr[:, 3:4]
+        horiz = np.maximum(np.maximum(x1.T - x2, x1 - x2.T), 0)
+        vert = np.maximum(np.maximum(y1.T - y2, y1 - y2.T), 0)
+        close = np.maximum(horiz, vert) <= threshold
+        edges = np.argwhere(np.triu(close, 1))
+        if len(edges) == 0:
+            break
+        parent = list(range(len(boxes)))
+
+        def find(i):
+            """
+            Finds the component root of i with path halving.
+            """
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for i, j in edges:
+            root_i = find(int(i))
+            root_j = find(int(j))
+            if root_i != root_j:
+                parent[root_j] = root_i
+        roots = np.array([find(i) for i in range(len(boxes))])
+        merged = []
+        for root in np.unique(roots):
+            members = arr[roots == root]
+            merged.append((
+                int(members[:, 0].min()),
+                int(members[:, 1].min()),
+                int(members[:, 2].max()),
+                int(members[:, 3].max())
+            ))
+        if len(merged) == len(boxes):
+            break
+        boxes = merged
     return boxes
\ No newline at end of file
@@ -2,6 +2,12 @@ import cv2
 
 """
 Contains default configuration constants for text removal operations.
+
+DEFAULT_INPAINT_METHOD may be cv2.INPAINT_TELEA, cv2.INPAINT_NS, or None.
+None selects the method per region: Navier-Stokes for regions up to
+DEFAULT_SMALL_ROI_AREA pixels at radii up to 3, where it avoids the
+per-pixel priority-queue overhead of Telea's fast-marching solver, and
+Telea for larger regions, where it produces the more plausible fill.
 """
 
 DEFAULT_PHRASES = [
@@ -31,7 +37,9 @@ DEFAULT_PHRASES = [
 ]
 
 DEFAULT_INPAINT_RADIUS = 3
-DEFAULT_INPAINT_METHOD = cv2.INPAINT_TELEA
+DEFAULT_OCR_MAX_DIMENSION = 1200
+DEFAULT_INPAINT_METHOD = None
+DEFAULT_SMALL_ROI_AREA = 40000
 DEFAULT_PAD_WIDTH = 8
 DEFAULT_PAD_HEIGHT = 0
 DEFAULT_COMBINE_THRESHOLD = 50
@@ -1,7 +1,14 @@
 import cv2
 import numpy as np
 import logging
-from .config import DEFAULT_INPAINT_RADIUS, DEFAULT_INPAINT_METHOD
+from functools import lru_cache
+from .config import (
+    DEFAULT_PHRASES,
+    DEFAULT_INPAINT_RADIUS,
+    DEFAULT_INPAINT_METHOD,
+    DEFAULT_OCR_MAX_DIMENSION,
+    DEFAULT_SMALL_ROI_AREA
+)
 from .bbox_utils import combine_boxes_close
 from .tesseract_utils import detect_text
 
@@ -23,22 +30,144 @@ def remove_phrases(
     inpaint_method=DEFAULT_INPAINT_METHOD,
     do_dilate=True,
     dilate_kernel_size=5,
-    combine_threshold=50
+    combine_threshold=50,
+    cancel_event=None
 ):
     """
     Removes text from an image file by detecting any of the specified phrases
-    using Tesseract OCR, then inpainting those regions. 
+    using Tesseract OCR, then inpainting those regions.
+    If cancel_event is provided and becomes set, processing is abandoned
+    between stages and None is returned.
     Returns the inpainted image or (inpainted_image, debug_overlay) if debug is True.
     """
+    if cancel_event is not None and cancel_event.is_set():
+        logger.debug("Canceled before reading: %s", image_path)
+        return None
     image = cv2.imread(image_path)
     if image is None:
         logger.error("Could not read image: %s", image_path)
         return None
+    return _remove_phrases_from_image(
+        image,
+        image_path,
+        phrases,
+        debug=debug,
+        pad_width=pad_width,
+        pad_height=pad_height,
+        inpaint_radius=inpaint_radius,
+        inpaint_method=inpaint_method,
+        do_dilate=do_dilate,
+        dilate_kernel_size=dilate_kernel_size,
+        combine_threshold=combine_threshold,
+        cancel_event=cancel_event
+    )
+
+def remove_phrases_from_bytes(
+    image_bytes,
+    phrases,
+    tesseract_cmd=None,
+    debug=False,
+    pad_width=8,
+    pad_height=0,
+    inpaint_radius=DEFAULT_INPAINT_RADIUS,
+    inpaint_method=DEFAULT_INPAINT_METHOD,
+    do_dilate=True,
+    dilate_kernel_size=5,
+    combine_threshold=50,
+    cancel_event=None,
+    source="<bytes>"
+):
+    """
+    Same as remove_phrases, but takes the raw encoded file contents instead
+    of a path, so callers can prefetch files on a separate I/O thread.
+    source is only used for log messages.
+    """
+    if cancel_event is not None and cancel_event.is_set():
+        logger.debug("Canceled before decoding: %s", source)
+        return None
+    image = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        logger.error("Could not decode image: %s", source)
+        return None
+    return _remove_phrases_from_image(
+        image,
+        source,
+        phrases,
+        debug=debug,
+        pad_width=pad_width,
+        pad_height=pad_height,
+        inpaint_radius=inpaint_radius,
+        inpaint_method=inpaint_method,
+        do_dilate=do_dilate,
+        dilate_kernel_size=dilate_kernel_size,
+        combine_threshold=combine_threshold,
+        cancel_event=cancel_event
+    )
+
+def _has_text_candidates(gray_image):
+    """
+    Cheap pre-OCR gate. Proxy watermarks sit in the bottom strip of a
+    card, so this thresholds the bottom 15% of the grayscale image and
+    counts connected components with text-like proportions. Returns
+    False when fewer than three are found, in which case the caller can
+    skip the full OCR pass.
+    """
+    height = gray_image.shape[0]
+    strip = gray_image[int(height * 0.85):]
+    if strip.size == 0:
+        return True
+    binary = cv2.adaptiveThreshold(
+        strip, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV, 15, 10
+    )
+    n_labels, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    strip_height = strip.shape[0]
+    candidates = 0
+    for i in range(1, n_labels):
+        w = stats[i, cv2.CC_STAT_WIDTH]
+        h = stats[i, cv2.CC_STAT_HEIGHT]
+        if h < 4 or h > strip_height * 0.9:
+            continue
+        if 0.1 <= w / h <= 15.0:
+            candidates += 1
+            if candidates >= 3:
+                return True
+    return False
+
+def _remove_phrases_from_image(
+    image,
+    source,
+    phrases,
+    debug=False,
+    pad_width=8,
+    pad_height=0,
+    inpaint_radius=DEFAULT_INPAINT_RADIUS,
+    inpaint_method=DEFAULT_INPAINT_METHOD,
+    do_dilate=True,
+    dilate_kernel_size=5,
+    combine_threshold=50,
+    cancel_event=None
+):
+    """
+    Shared pipeline behind remove_phrases and remove_phrases_from_bytes,
+    operating on an already decoded BGR image.
+    """
     debug_image = image.copy() if debug else None
-    rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-    data = detect_text(rgb)
+    ocr_gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    scale = min(1.0, DEFAULT_OCR_MAX_DIMENSION / max(image.shape[:2]))
+    if scale < 1.0:
+        ocr_gray = cv2.resize(ocr_gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        logger.debug("OCR input downscaled by %.3f: %s", scale, source)
+    if not _has_text_candidates(ocr_gray):
+        logger.info("No text-like regions found. Returning original image.")
+        if debug:
+            return image, debug_image
+        return image
+    data = detect_text(ocr_gray)
+    if cancel_event is not None and cancel_event.is_set():
+        logger.debug("Canceled after OCR: %s", source)
+        return None
     line_data = group_words_by_line(data)
-    boxes_to_remove = collect_boxes_for_phrases(line_data, phrases, pad_width, pad_height, debug)
+    boxes_to_remove = collect_boxes_for_phrases(line_data, phrases, pad_width, pad_height, debug, scale=scale)
     if combine_threshold > 0 and boxes_to_remove:
         boxes_to_remove = combine_boxes_close(boxes_to_remove, combine_threshold, debug)
     if not boxes_to_remove:
@@ -46,18 +175,36 @@ def remove_phrases(
         if debug:
             return image, debug_image
         return image
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    mask = np.zeros_like(gray, dtype=np.uint8)
-    for (x1, y1, x2, y2) in boxes_to_remove:
-        cv2.rectangle(mask, (x1, y1), (x2, y2), 255, -1)
-        if debug_image is not None:
-            cv2.rectangle(debug_image, (x1, y1), (x2, y2), (0, 0, 255), 2)
-    if do_dilate:
-        kernel = np.ones((dilate_kernel_size, dilate_kernel_size), dtype=np.uint8)
-        mask = cv2.dilate(mask, kernel, iterations=1)
-        logger.debug("Mask dilation applied.")
+    boxes_arr = np.asarray(boxes_to_remove, dtype=np.intp)
+    np.clip(boxes_arr, 0, None, out=boxes_arr)
+    if cancel_event is not None and cancel_event.is_set():
+        logger.debug("Canceled before inpainting: %s", source)
+        return None
     logger.debug("Inpainting started.")
-    image = cv2.inpaint(image, mask, inpaint_radius, inpaint_method)
+    height, width = image.shape[:2]
+    kernel = None
+    if do_dilate and dilate_kernel_size > 1:
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (dilate_kernel_size, dilate_kernel_size))
+    pad = inpaint_radius + (dilate_kernel_size if kernel is not None else 0) + 2
+    for (x1, y1, x2, y2) in boxes_arr:
+        if debug_image is not None:
+            cv2.rectangle(debug_image, (int(x1), int(y1)), (int(x2), int(y2)), (0, 0, 255), 2)
+        rx1 = max(int(x1) - pad, 0)
+        ry1 = max(int(y1) - pad, 0)
+        rx2 = min(int(x2) + 1 + pad, width)
+        ry2 = min(int(y2) + 1 + pad, height)
+        roi = image[ry1:ry2, rx1:rx2]
+        local_mask = np.zeros(roi.shape[:2], dtype=np.uint8)
+        local_mask[y1 - ry1:y2 + 1 - ry1, x1 - rx1:x2 + 1 - rx1] = 255
+        if kernel is not None:
+            local_mask = cv2.dilate(local_mask, kernel, iterations=1)
+        method = inpaint_method
+        if method is None:
+            if inpaint_radius <= 3 and (rx2 - rx1) * (ry2 - ry1) <= DEFAULT_SMALL_ROI_AREA:
+                method = cv2.INPAINT_NS
+            else:
+                method = cv2.INPAINT_TELEA
+        image[ry1:ry2, rx1:rx2] = cv2.inpaint(roi, local_mask, inpaint_radius, method)
     logger.debug("Inpainting finished.")
     if debug:
         return image, debug_image
@@ -84,48 +231,69 @@ def group_words_by_line(data):
         line_data[line_num].append((txt, x, y, w, h))
     return line_data
 
-def collect_boxes_for_phrases(line_data, phrases, pad_width, pad_height, debug=False):
+@lru_cache(maxsize=8)
+def _build_phrase_trie(phrases_tuple):
+    """
+    Builds a word-token trie from the phrases, so overlapping prefixes
+    (e.g. the several "Playtest Card ..." variants) are walked once per
+    line position instead of once per phrase. Keys are lowercased words;
+    a None entry marks the end of a complete phrase. The call below warms
+    the cache for DEFAULT_PHRASES at import, so worker processes build
+    the default trie during spawn rather than on their first image.
+    """
+    trie = {}
+    for phrase in phrases_tuple:
+        words = [w.strip().lower() for w in phrase.split() if w.strip()]
+        if not words:
+            continue
+        node = trie
+        for word in words:
+            node = node.setdefault(word, {})
+        node[None] = True
+    return trie
+
+_build_phrase_trie(tuple(DEFAULT_PHRASES))
+
+def collect_boxes_for_phrases(line_data, phrases, pad_width, pad_height, debug=False, scale=1.0):
     """
     Collects bounding boxes for words matching any of the specified phrases,
-    returning a list of (x1, y1, x2, y2).
+    returning a list of (x1, y1, x2, y2). If the OCR ran on a downscaled
+    image, scale maps the detected coordinates back onto the original
+    resolution before padding.
     """
     boxes_to_remove = []
-    phrase_lists = []
-    for p in phrases:
-        p_list = [w.strip() for w in p.split() if w.strip()]
-        if p_list:
-            phrase_lists.append(p_list)
+    inv_scale = 1.0 / scale
+    trie = _build_phrase_trie(tuple(phrases))
     for line_num, words_info in line_data.items():
         if debug:
             line_text_joined = " ".join([wi[0] for wi in words_info])
             print(f"[DEBUG] Line {line_num}: '{line_text_joined}'")
         indices_to_remove = set()
-        for phrase_list in phrase_lists:
-            ph_len = len(phrase_list)
-            for start_idx in range(len(words_info) - ph_len + 1):
-                window_texts = [words_info[j][0] for j in range(start_idx, start_idx + ph_len)]
-                if match_window(window_texts, phrase_list):
-                    for j in range(start_idx, start_idx + ph_len):
-                        indices_to_remove.add(j)
+        lower_words = [wi[0].lower() for wi in words_info]
+        n_words = len(lower_words)
+        for start_idx in range(n_words):
+            node = trie
+            j = start_idx
+            while j < n_words:
+                node = node.get(lower_words[j])
+                if node is None:
+                    break
+                j += 1
+                if None in node:
+                    indices_to_remove.update(range(start_idx, j))
                     if debug:
-                        matched_str = " ".join(window_texts)
+                        matched_str = " ".join(words_info[k][0] for k in range(start_idx, j))
                         print(f"    [DEBUG] Matched phrase: '{matched_str}'")
         for idx in indices_to_remove:
             _, x, y, w, h = words_info[idx]
+            if inv_scale != 1.0:
+                x = int(x * inv_scale)
+                y = int(y * inv_scale)
+                w = int(w * inv_scale)
+                h = int(h * inv_scale)
             x1 = max(x - pad_width, 0)
             y1 = max(y - pad_height, 0)
             x2 = x + w + pad_width
             y2 = y + h + pad_height
             boxes_to_remove.append((x1, y1, x2, y2))
-    return boxes_to_remove
-
-def match_window(word_list, phrase_list):
-    """
-    Checks if the words in word_list match phrase_list exactly, ignoring case.
-    """
-    if len(word_list) != len(phrase_list):
-        return False
-    for w1, w2 in zip(word_list, phrase_list):
-        if w1.lower() != w2.lower():
-            return False
-    return True
\ No newline at end of file
+    return boxes_to_remove
\ No newline at end of file
@@ -1,21 +1,79 @@
+import threading
 import pytesseract
 from pytesseract import Output
 
+try:
+    import tesserocr
+    from PIL import Image
+except ImportError:
+    tesserocr = None
+
 """
 Tesseract utilities for text detection and configuration.
 """
 
+_thread_local = threading.local()
+
+def _get_api():
+    """
+    Returns a thread-local tesserocr API, created on first use so the
+    trained model is loaded once per worker instead of once per image.
+    """
+    api = getattr(_thread_local, "api", None)
+    if api is None:
+        api = tesserocr.PyTessBaseAPI()
+        _thread_local.api = api
+    return api
+
+def _detect_text_tesserocr(image):
+    """
+    Runs OCR through the persistent tesserocr API and reshapes the word
+    iterator output into the same dictionary layout that
+    pytesseract.image_to_data produces.
+    """
+    api = _get_api()
+    api.SetImage(Image.fromarray(image))
+    api.Recognize()
+    data = {"text": [], "left": [], "top": [], "width": [], "height": [], "line_num": []}
+    it = api.GetIterator()
+    if it is None:
+        return data
+    level = tesserocr.RIL.WORD
+    line_num = 0
+    while True:
+        if it.IsAtBeginningOf(tesserocr.RIL.TEXTLINE):
+            line_num += 1
+        word = it.GetUTF8Text(level)
+        box = it.BoundingBox(level)
+        if word and box:
+            x1, y1, x2, y2 = box
+            data["text"].append(word)
+            data["left"].append(x1)
+            data["top"].append(y1)
+            data["width"].append(x2 - x1)
+            data["height"].append(y2 - y1)
+            data["line_num"].append(line_num)
+        if not it.Next(level):
+            break
+    return data
+
 def detect_text(rgb_image):
     """
     Returns OCR data from Tesseract as a dictionary with bounding box
-    information for each recognized word.
+    information for each recognized word. Uses a persistent tesserocr
+    API per thread when tesserocr is installed, avoiding the
+    subprocess-per-image and model-reload cost of pytesseract;
+    otherwise falls back to pytesseract.
     """
+    if tesserocr is not None:
+        return _detect_text_tesserocr(rgb_image)
     return pytesseract.image_to_data(rgb_image, output_type=Output.DICT)
 
 def configure_tesseract(tesseract_cmd=None):
     """
     Sets the Tesseract command if a custom path is provided.
-    Otherwise uses the system default.
+    Otherwise uses the system default. Only affects the pytesseract
+    fallback; tesserocr links libtesseract directly.
     """
     if tesseract_cmd:
-        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
\ No newline at end of file
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd